@@ -14,4 +14,7 @@ class TorchOverlayApplication:
         window = self._factory.create_main_window(controller)
 
         controller.attach_ui(window)
-        window.run()
+        try:
+            window.run()
+        finally:
+            controller.shutdown()
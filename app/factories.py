@@ -1,4 +1,7 @@
-from core.config import AppConfig
+import os
+
+from core.config import AppConfig, OcrConfig
+from core.constants import OCR_CACHE_DIR, DEFAULT_OCR_CACHE_TTL_SEC, DEFAULT_OCR_CACHE_MAX_SIZE, DEFAULT_OCR_CACHE_MAX_DISK_ENTRIES
 from controllers.app_controller import AppController
 from services.admin_service import AdminService
 from services.window_finder import WindowFinder
@@ -6,7 +9,9 @@ from services.game_binder import GameBinder
 from services.process_watcher import ProcessWatcher
 from ui.main_window import MainWindow
 from services.capture_service import CaptureService
+from services.ocr.base_ocr import IOcrEngine
 from services.ocr.baidu_ocr import BaiduOcrEngine, BaiduOcrConfig
+from services.ocr.ocr_cache import OcrCacheService
 from services.overlay.overlay_service import OverlayService
 
 
@@ -48,7 +53,15 @@ class AppFactory:
         capture = self.create_capture_service()
         ocr = self.create_ocr_engine()
         overlay = self.create_overlay_service()
-        return AppController(cfg=self._cfg, binder=binder, watcher=watcher, capture=capture, ocr=ocr, overlay=overlay)
+        return AppController(
+            cfg=self._cfg,
+            binder=binder,
+            watcher=watcher,
+            capture=capture,
+            ocr=ocr,
+            overlay=overlay,
+            ocr_factory=self.create_ocr_engine,
+        )
 
     def create_overlay_service(self) -> OverlayService:
         return OverlayService()
@@ -59,20 +72,30 @@ class AppFactory:
     def create_capture_service(self) -> CaptureService:
         return CaptureService()
 
-    def create_ocr_engine(self):
+    def create_ocr_engine(self, ocr_cfg: OcrConfig | None = None) -> IOcrEngine:
+        """按 OCR 配置创建引擎（带结果缓存）；不传时使用启动时加载的配置"""
+        ocr_cfg = ocr_cfg or self._cfg.ocr
         cfg = BaiduOcrConfig(
-            api_key=self._cfg.ocr.api_key,
-            secret_key=self._cfg.ocr.secret_key,
-            api_name=self._cfg.ocr.api_name,
-            timeout_sec=self._cfg.ocr.timeout_sec,
-            max_retries=self._cfg.ocr.max_retries,
-            debug_mode=self._cfg.ocr.debug_mode,
+            api_key=ocr_cfg.api_key,
+            secret_key=ocr_cfg.secret_key,
+            api_name=ocr_cfg.api_name,
+            timeout_sec=ocr_cfg.timeout_sec,
+            max_retries=ocr_cfg.max_retries,
+            debug_mode=ocr_cfg.debug_mode,
         )
         self._debug_print("[AppFactory] 创建 OCR 引擎:")
         self._debug_print(f"  API Key 长度: {len(cfg.api_key)}")
         self._debug_print(f"  Secret Key 长度: {len(cfg.secret_key)}")
         self._debug_print(f"  Debug Mode: {cfg.debug_mode}")
-        return BaiduOcrEngine(cfg)
+        # 按 API 类型分目录缓存，不同接口的识别结果互不混用
+        return OcrCacheService(
+            BaiduOcrEngine(cfg),
+            cache_dir=os.path.join(os.getcwd(), OCR_CACHE_DIR, cfg.api_name),
+            cache_ttl_sec=DEFAULT_OCR_CACHE_TTL_SEC,
+            max_cache_size=DEFAULT_OCR_CACHE_MAX_SIZE,
+            max_disk_entries=DEFAULT_OCR_CACHE_MAX_DISK_ENTRIES,
+            debug_mode=cfg.debug_mode,
+        )
 
     def recreate_ocr_engine(self):
         """重新创建OCR引擎（用于配置更新后）"""
@@ -1,13 +1,35 @@
 import os
+import queue
+import re
+import threading
 import time
+from dataclasses import dataclass
+from typing import Callable
 
-from core.config import AppConfig
+from core.config import AppConfig, OcrConfig
+from core.models import BoundGame
 from services.game_binder import GameBinder
 from services.process_watcher import ProcessWatcher
 from services.capture_service import CaptureService
 from services.ocr.base_ocr import IOcrEngine
 from services.overlay.overlay_service import OverlayService, OverlayTextItem
 
+# 余额识别：连续数字
+_DIGITS_RE = re.compile(r'\d+')
+
+# 主线程轮询后台识别结果的间隔
+_DETECT_POLL_INTERVAL_MS = 50
+
+
+@dataclass(slots=True)
+class DetectResult:
+    """一次识别的结果（后台线程产出，主线程消费）"""
+    balance: str
+    info: str | None = None  # 需要弹窗提示的信息
+    hwnd: int | None = None
+    text_items: list[OverlayTextItem] | None = None  # 非空时在覆盖层上显示
+    close_overlay: bool = False
+
 
 class AppController:
     """控制器：业务流程与 UI 交互的中枢。"""
@@ -20,14 +42,18 @@ class AppController:
         capture: CaptureService,
         ocr: IOcrEngine,
         overlay: OverlayService,
+        ocr_factory: Callable[[OcrConfig], IOcrEngine],
     ):
         self._cfg = cfg
         self._binder = binder
         self._watcher = watcher
         self._capture = capture
         self._ocr = ocr
+        self._ocr_factory = ocr_factory  # 配置变更后按新配置重建 OCR 引擎
         self._overlay = overlay
         self._ui = None
+        self._detect_thread: threading.Thread | None = None
+        self._detect_results: queue.Queue = queue.Queue()
 
     def attach_ui(self, ui):
         self._ui = ui
@@ -70,107 +96,138 @@ class AppController:
             self._ui.show_info("未绑定游戏窗口，无法识别。")
             return
 
+        # 上一次识别还没结束，忽略重复点击
+        if self._detect_thread is not None and self._detect_thread.is_alive():
+            return
+
+        # 截图和OCR都是阻塞操作，放到后台线程执行，避免卡住 Tk 主循环；
+        # 结果通过队列交回主线程，由主线程更新界面和覆盖层
+        self._detect_thread = threading.Thread(target=self._run_detect, args=(bound, self._ocr), daemon=True)
+        self._detect_thread.start()
+        self._ui.schedule(_DETECT_POLL_INTERVAL_MS, self._poll_detect_result)
+
+    def _run_detect(self, bound: BoundGame, ocr: IOcrEngine):
+        """后台线程：截图、识别并构建覆盖层文本项（不接触 Tk）"""
+        try:
+            result = self._detect(bound, ocr)
+        except Exception as e:
+            result = DetectResult(balance="--", info=f"识别失败：{e}")
+        self._detect_results.put(result)
+
+    def _poll_detect_result(self):
+        """主线程：轮询后台识别结果"""
+        try:
+            result = self._detect_results.get_nowait()
+        except queue.Empty:
+            self._ui.schedule(_DETECT_POLL_INTERVAL_MS, self._poll_detect_result)
+            return
+        self._apply_detect_result(result)
+
+    def _apply_detect_result(self, result: DetectResult):
+        """主线程：把识别结果应用到界面和覆盖层"""
+        # 更新UI
+        self._ui.update_balance(result.balance)
+
+        if result.text_items is not None:
+            # 创建或更新overlay，在overlay上显示文本
+            if not self._overlay.is_visible():
+                self._overlay.create_overlay(result.hwnd)
+            self._overlay.show_texts(result.text_items)
+        elif result.close_overlay:
+            self._overlay.close()
+
+        if result.info:
+            self._ui.show_info(result.info)
+
+    def _detect(self, bound: BoundGame, ocr: IOcrEngine) -> DetectResult:
+        """截图 + OCR，返回需要在主线程展示的结果"""
         # 余额识别区域配置
-        balance_region = {
-            'x': self._cfg.balance_region.x,
-            'y': self._cfg.balance_region.y,
-            'width': self._cfg.balance_region.width,
-            'height': self._cfg.balance_region.height,
-            'name': '余额区域'
-        }
+        balance_region = self._cfg.balance_region
 
         balance_value = "--"
 
         if self._cfg.ocr.debug_mode:
-            print(f"\n[余额识别] 尝试区域 ({balance_region['name']}): x={balance_region['x']}, y={balance_region['y']}, width={balance_region['width']}, height={balance_region['height']}")
+            print(f"\n[余额识别] 尝试区域 (余额区域): x={balance_region.x}, y={balance_region.y}, width={balance_region.width}, height={balance_region.height}")
 
-        # 截取余额区域
-        balance_out_path = os.path.join(os.getcwd(), "captures/last_balance.png")
-        cap = self._capture.capture_region_once(bound.hwnd, balance_out_path, balance_region, timeout_sec=2.5, preprocess=False)
+        # 截 client 区域（用于OCR/Overlay对齐）
+        out_path = os.path.join(os.getcwd(), "captures", "last_client.png")
+        cap = self._capture.capture_client_once(bound.hwnd, out_path, timeout_sec=2.5)
 
+        # 余额区域直接从同一张 client 截图裁剪，不再单独截一次窗口
+        balance_out_path = os.path.join(os.getcwd(), "captures/last_balance.png")
         if cap.ok and cap.path:
-            if self._cfg.ocr.debug_mode:
-                print(f"[余额识别] 截图已保存到: {balance_out_path}")
+            balance_cap = self._capture.crop_region(cap.path, balance_out_path, balance_region, preprocess=False)
+        else:
+            balance_cap = cap
 
-            # 识别余额
-            r = self._ocr.recognize(cap.path)
-            if r.ok and r.text:
-                balance_value = self._extract_balance(r.text)
+        if balance_cap.ok and balance_cap.path and self._cfg.ocr.debug_mode:
+            print(f"[余额识别] 截图已保存到: {balance_out_path}")
 
-                if self._cfg.ocr.debug_mode:
-                    print(f"[余额识别] 原始识别: {repr(r.text)}")
-                    print(f"[余额识别] 提取余额: {balance_value}")
+        # 余额与 client 两张图并发识别，总耗时约为较慢的一次请求
+        paths = [c.path for c in (balance_cap, cap) if c.ok and c.path]
+        results = dict(zip(paths, ocr.recognize_many(paths)))
 
-        # 更新UI
-        self._ui.update_balance(balance_value)
+        # 识别余额
+        r = results.get(balance_cap.path) if balance_cap.ok else None
+        if r is not None and r.ok and r.text:
+            balance_value = self._extract_balance(r.text)
+
+            if self._cfg.ocr.debug_mode:
+                print(f"[余额识别] 原始识别: {repr(r.text)}")
+                print(f"[余额识别] 提取余额: {balance_value}")
 
         if self._cfg.ocr.debug_mode and balance_value == "--":
             print(f"\n[余额识别] 识别失败，无法识别余额")
 
-        # 截 client 区域（用于OCR/Overlay对齐）
-        out_path = os.path.join(os.getcwd(), "captures", "last_client.png")
-        cap = self._capture.capture_client_once(bound.hwnd, out_path, timeout_sec=2.5)
-
         if not cap.ok or not cap.path:
-            self._ui.show_info(f"截图失败：{cap.error}")
-            return
+            return DetectResult(balance=balance_value, info=f"截图失败：{cap.error}")
 
         # 云OCR
-        r = self._ocr.recognize(cap.path)
+        r = results[cap.path]
         if not r.ok:
-            self._ui.show_info(f"OCR失败：{r.error}")
-            return
+            return DetectResult(balance=balance_value, info=f"OCR失败：{r.error}")
 
         # 显示识别文本和坐标信息
-        if r.text:
-            # 创建或更新overlay
-            if not self._overlay.is_visible():
-                self._overlay.create_overlay(bound.hwnd)
-
-            # 转换OCR结果为overlay文本项
-            text_items = []
-            if r.words:
-                for word in r.words:
-                    text_item = OverlayTextItem(
-                        text=word.text,
-                        x=word.x,
-                        y=word.y,
-                        width=word.width,
-                        height=word.height,
-                        color="#00FF00",
-                        font_size=14,
-                    )
-                    text_items.append(text_item)
-
-                # 在overlay上显示文本
-                self._overlay.show_texts(text_items)
-
-                # 在控制台输出坐标信息
-                if self._cfg.ocr.debug_mode:
-                    print("\n[Overlay] 识别到的文本及坐标信息:")
-                    for word in r.words:
-                        print(f"  文本: {word.text}")
-                        print(f"  位置: x={word.x}, y={word.y}, width={word.width}, height={word.height}")
-                        print(f"  边界: ({word.x}, {word.y}) - ({word.x + word.width}, {word.y + word.height})")
-            else:
-                self._overlay.close()
-                self._ui.show_info(r.text)
-        else:
-            self._overlay.close()
-            self._ui.show_info("未识别到文字")
+        if not r.text:
+            return DetectResult(balance=balance_value, info="未识别到文字", close_overlay=True)
+        if not r.words:
+            return DetectResult(balance=balance_value, info=r.text, close_overlay=True)
+
+        # 转换OCR结果为overlay文本项
+        text_items = []
+        for word in r.words:
+            text_item = OverlayTextItem(
+                text=word.text,
+                x=word.x,
+                y=word.y,
+                width=word.width,
+                height=word.height,
+                color="#00FF00",
+                font_size=14,
+            )
+            text_items.append(text_item)
+
+        # 在控制台输出坐标信息
+        if self._cfg.ocr.debug_mode:
+            print("\n[Overlay] 识别到的文本及坐标信息:")
+            for word in r.words:
+                print(f"  文本: {word.text}")
+                print(f"  位置: x={word.x}, y={word.y}, width={word.width}, height={word.height}")
+                print(f"  边界: ({word.x}, {word.y}) - ({word.x + word.width}, {word.y + word.height})")
+
+        return DetectResult(balance=balance_value, hwnd=bound.hwnd, text_items=text_items)
 
     def _extract_balance(self, text: str) -> str:
         """从识别的文本中提取余额数字"""
-        import re
         # 匹配连续的数字
-        numbers = re.findall(r'\d+', text)
+        numbers = _DIGITS_RE.findall(text)
         if numbers:
             # 取最长的数字串（最可能是余额）
             balance = max(numbers, key=len)
-            # 格式化余额（添加千分位分隔符）
+            # 格式化余额（添加千分位分隔符）；
+            # Python 3.11+ 对超过 4300 位的数字串 int() 会抛 ValueError，此时原样返回
             try:
-                num = int(balance)
-                return f"{num:,}"
+                return f"{int(balance):,}"
             except ValueError:
                 return balance
         return "--"
@@ -178,9 +235,6 @@ class AppController:
     def update_config(self, ocr_config, watch_interval_ms: int) -> bool:
         """更新配置"""
         try:
-            from core.config import AppConfig, OcrConfig
-            from services.ocr.baidu_ocr import BaiduOcrEngine, BaiduOcrConfig
-
             # 更新配置对象
             self._cfg = AppConfig(
                 app_title_prefix=self._cfg.app_title_prefix,
@@ -198,15 +252,8 @@ class AppController:
             self._watcher.interval_ms = watch_interval_ms
 
             # 重新创建OCR引擎（重要：确保新配置生效，包括debug_mode）
-            ocr_cfg = BaiduOcrConfig(
-                api_key=ocr_config.api_key,
-                secret_key=ocr_config.secret_key,
-                api_name=ocr_config.api_name,
-                timeout_sec=ocr_config.timeout_sec,
-                max_retries=ocr_config.max_retries,
-                debug_mode=ocr_config.debug_mode,
-            )
-            self._ocr = BaiduOcrEngine(ocr_cfg)
+            self._ocr.close()
+            self._ocr = self._ocr_factory(ocr_config)
 
             return True
         except Exception as e:
@@ -216,3 +263,7 @@ class AppController:
     def get_config(self):
         """获取当前配置"""
         return self._cfg
+
+    def shutdown(self):
+        """程序退出时释放资源"""
+        self._ocr.close()
@@ -56,6 +56,10 @@ class AppConfig:
         ocr_data = data_copy.pop('ocr', {})
         ocr_config = OcrConfig.from_dict(ocr_data)
 
+        # 处理余额区域配置（保存时会被展开成字典）
+        if isinstance(data_copy.get('balance_region'), dict):
+            data_copy['balance_region'] = BalanceRegionConfig.from_dict(data_copy['balance_region'])
+
         return cls(ocr=ocr_config, **data_copy)
 
     def to_dict(self) -> dict[str, Any]:
@@ -71,22 +75,44 @@ class AppConfig:
     def load(cls) -> 'AppConfig':
         """从文件加载配置"""
         config_path = cls.get_config_path()
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return cls.from_dict(data)
-            except Exception as e:
-                print(f"加载配置文件失败: {e}")
+        # 直接打开文件，由 FileNotFoundError 判断是否存在，省去一次 exists() 的 stat 调用
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls.from_dict(data)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"加载配置文件失败: {e}")
         return cls()
 
     def save(self) -> bool:
         """保存配置到文件"""
+        tmp_path = None
         try:
             config_path = self.get_config_path()
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.to_dict(), f, indent=4, ensure_ascii=False)
+            content = json.dumps(self.to_dict(), indent=4, ensure_ascii=False)
+
+            # 内容没有变化时不重写文件
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    if f.read() == content:
+                        return True
+            except FileNotFoundError:
+                pass
+
+            # 先写临时文件再原子替换，写到一半被中断也不会留下损坏的配置文件
+            tmp_path = config_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, config_path)
             return True
         except Exception as e:
             print(f"保存配置文件失败: {e}")
+            # 写入或替换失败时删除残留的临时文件
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
             return False
@@ -24,6 +24,12 @@ DEFAULT_OCR_TIMEOUT_SEC = 15.0
 DEFAULT_OCR_MAX_RETRIES = 2
 DEFAULT_OCR_DEBUG_MODE = False
 
+# OCR 结果缓存
+OCR_CACHE_DIR = "cache/ocr"
+DEFAULT_OCR_CACHE_TTL_SEC = 300.0
+DEFAULT_OCR_CACHE_MAX_SIZE = 64
+DEFAULT_OCR_CACHE_MAX_DISK_ENTRIES = 256
+
 # 窗口标题前缀
 DEFAULT_APP_TITLE_PREFIX = "Torch"
 
@@ -5,10 +5,11 @@ from dataclasses import dataclass
 from PIL import Image
 import win32gui
 
+from core.config import BalanceRegionConfig
 from services.overlay.target_window import get_client_rect_in_screen
 
 
-@dataclass
+@dataclass(slots=True)
 class CaptureResult:
     ok: bool
     path: str | None = None
@@ -82,13 +83,13 @@ class CaptureService:
         self,
         target_hwnd: int,
         out_path: str,
-        region: dict,
+        region: BalanceRegionConfig,
         timeout_sec: float = 2.5,
         preprocess: bool = False,
     ) -> CaptureResult:
         """
         截取 client 区域内的指定子区域
-        region: 字典，包含 x, y, width, height（相对于 client 区域的坐标）
+        region: 区域配置，包含 x, y, width, height（相对于 client 区域的坐标）
         preprocess: 是否对截图进行预处理（可选，当前未实现）
         """
         if not target_hwnd or not win32gui.IsWindow(target_hwnd):
@@ -105,13 +106,38 @@ class CaptureService:
             return client
 
         # 2) 从 client 截图中裁剪出指定区域
+        result = self.crop_region(tmp_client, out_path, region, preprocess=preprocess)
+
+        # 清理临时文件
+        try:
+            os.remove(tmp_client)
+        except Exception:
+            pass
+
+        return result
+
+    def crop_region(
+        self,
+        client_path: str,
+        out_path: str,
+        region: BalanceRegionConfig,
+        preprocess: bool = False,
+    ) -> CaptureResult:
+        """
+        从已有的 client 截图中裁剪出指定子区域，不再重新截图
+        region: 区域配置，包含 x, y, width, height（相对于 client 区域的坐标）
+        preprocess: 是否对截图进行预处理（可选，当前未实现）
+        """
+        out_path = os.path.abspath(out_path)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
         try:
-            x = int(region['x'])
-            y = int(region['y'])
-            width = int(region['width'])
-            height = int(region['height'])
+            x = int(region.x)
+            y = int(region.y)
+            width = int(region.width)
+            height = int(region.height)
 
-            im = Image.open(tmp_client).convert("RGBA")
+            im = Image.open(client_path).convert("RGBA")
             img_w, img_h = im.size
 
             # 检查区域是否在图像范围内
@@ -128,12 +154,6 @@ class CaptureService:
 
             cropped.save(out_path)
 
-            # 清理临时文件
-            try:
-                os.remove(tmp_client)
-            except Exception:
-                pass
-
             return CaptureResult(ok=True, path=out_path)
 
         except Exception as e:
@@ -0,0 +1,23 @@
+"""
+OCR 模块共用的 JSON 编解码：优先使用可选依赖 orjson，未安装时退回标准库 json。
+- loads 直接接受 bytes，省去先解码成 str 的一次拷贝
+- dumps 返回紧凑格式（不缩进）的 UTF-8 bytes
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+else:
+    loads = json.loads
+
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
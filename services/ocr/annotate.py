@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import Any
 from PIL import Image, ImageDraw, ImageFont
 
-@dataclass
+@dataclass(slots=True)
 class OcrBox:
     text: str
     left: int
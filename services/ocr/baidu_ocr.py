@@ -1,15 +1,31 @@
 from __future__ import annotations
 
-import base64
+import binascii
 import json
+import random
+import threading
 import time
 from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from services.ocr import _json
 from services.ocr.base_ocr import IOcrEngine, OcrResult, OcrWordResult
 
+# 值得重试的百度错误码：1 未知错误 / 2 服务暂不可用 / 18 QPS超限 / 110,111 token无效或过期 / 282000 服务内部错误
+# 其余（如 17/19 额度用尽、216201 图片格式错误）重试也不会成功
+_TRANSIENT_BAIDU_CODES = frozenset({1, 2, 18, 110, 111, 282000})
+_TOKEN_ERROR_CODES = frozenset({110, 111})
+
+# 单次重试等待上限（秒）
+_MAX_RETRY_DELAY_SEC = 30.0
+
+# 无位置信息时使用的空坐标
+_EMPTY_LOC: dict[str, int] = {}
+
 
 @dataclass(frozen=True)
 class BaiduOcrConfig:
@@ -31,81 +47,121 @@ class BaiduOcrEngine(IOcrEngine):
     文档：ai.baidu.com / cloud.baidu.com OCR
     """
 
+    _HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
     def __init__(self, cfg: BaiduOcrConfig):
         self._cfg = cfg
         self._token: str | None = None
         self._token_expire_at: float = 0.0  # epoch seconds
+        self._token_lock = threading.Lock()
+        self._endpoint_url: str = ""  # 带当前 token 的识别接口地址，随 token 刷新一起更新
 
-    def recognize(self, image_path: str) -> OcrResult:
-        try:
-            img_b64 = self._read_base64(image_path)
-        except Exception as e:
-            return OcrResult(ok=False, error=f"读取图片失败：{e}")
+        # 复用同一个 Session，保持与 aip.baidubce.com 的长连接，避免每次识别都重新握手 TLS
+        self._session = requests.Session()
+        self._session.headers.update({"Connection": "keep-alive"})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        self._session.mount("https://", adapter)
+
+    def close(self) -> None:
+        """释放连接池"""
+        self._session.close()
 
+    def recognize(self, image_path: str, image_bytes: bytes | None = None) -> OcrResult:
         try:
-            token = self._get_access_token()
+            if image_bytes is not None:
+                img_b64 = binascii.b2a_base64(image_bytes, newline=False)
+            else:
+                img_b64 = self._read_base64(image_path)
         except Exception as e:
-            return OcrResult(ok=False, error=f"获取百度token失败：{e}")
-
-        url = f"https://aip.baidubce.com/rest/2.0/ocr/v1/{self._cfg.api_name}?access_token={token}"
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+            return OcrResult(ok=False, error=f"读取图片失败：{e}")
 
         # 百度OCR是 x-www-form-urlencoded，image=base64（不是json）
         # 可加参数：detect_direction、paragraph、probability 等
-        data = {
-            "image": img_b64,
-            "detect_direction": "true",
-        }
+        # 请求体直接按字节拼好，重试时复用，不再每次走 requests 的表单编码；
+        # base64 中需要转义的只有 + / = 三个字符，用 bytes.replace 即可，不必逐字节过一遍 URL 编码
+        data = b"detect_direction=true&image=" + img_b64.replace(b"+", b"%2B").replace(b"/", b"%2F").replace(b"=", b"%3D")
 
         last_err = None
+        last_raw = None
         for attempt in range(self._cfg.max_retries + 1):
+            # 每次尝试重新取 token：token 失效被清空后，重试会使用新 token
+            try:
+                self._get_access_token()
+            except Exception as e:
+                return OcrResult(ok=False, error=f"获取百度token失败：{e}")
+
+            url = self._endpoint_url
+            retry_after = None
+
             try:
-                resp = requests.post(url, headers=headers, data=data, timeout=self._cfg.timeout_sec)
+                resp = self._session.post(url, headers=self._HEADERS, data=data, timeout=self._cfg.timeout_sec)
+            except requests.RequestException as e:
+                # 网络异常（超时、连接断开等）属于临时性错误
+                last_err = f"百度OCR请求失败：{e}"
+            else:
                 if resp.status_code != 200:
-                    last_err = f"HTTP {resp.status_code}: {resp.text[:300]}"
-                    raise RuntimeError(last_err)
-
-                j = resp.json()
-
-                # 调试输出原始数据
-                if self._cfg.debug_mode:
-                    print(f"\n[BaiduOcr] 原始响应数据:")
-                    print(f"  API类型: {self._cfg.api_name}")
-                    print(f"  识别结果数量: {len(j.get('words_result', []))}")
-                    if j.get('words_result'):
-                        print(f"  第一个结果: {json.dumps(j['words_result'][0], ensure_ascii=False, indent=2)}")
-
-                # 百度错误结构：error_code / error_msg
-                if "error_code" in j:
-                    # token 失效常见：110/111 等（有时会出现）
-                    # 这里遇到错误就清 token 重试一次
-                    last_err = f"百度OCR错误 {j.get('error_code')}: {j.get('error_msg')}"
-                    if attempt < self._cfg.max_retries:
+                    last_err = f"百度OCR请求失败：HTTP {resp.status_code}: {resp.text[:300]}"
+                    if not self._should_retry(resp):
+                        return OcrResult(ok=False, error=last_err)
+                    retry_after = self._parse_retry_after(resp.headers.get("Retry-After"))
+                else:
+                    try:
+                        j = _json.loads(resp.content)
+                    except ValueError as e:
+                        return OcrResult(ok=False, error=f"百度OCR响应解析失败：{e}")
+                    if not isinstance(j, dict):
+                        return OcrResult(ok=False, raw=j, error="百度OCR响应解析失败：响应不是JSON对象")
+
+                    # 调试输出原始数据
+                    if self._cfg.debug_mode:
+                        words_result = j.get('words_result')
+                        print(f"\n[BaiduOcr] 原始响应数据:")
+                        print(f"  API类型: {self._cfg.api_name}")
+                        if isinstance(words_result, list):
+                            print(f"  识别结果数量: {len(words_result)}")
+                            if words_result:
+                                print(f"  第一个结果: {json.dumps(words_result[0], ensure_ascii=False, indent=2)}")
+
+                    # 百度错误结构：error_code / error_msg
+                    if "error_code" not in j:
+                        # 字段类型不对（如坐标不是数字）时返回失败结果，不把异常抛给调用方
+                        try:
+                            text, words_list = self._parse_words_result(j)
+                        except (TypeError, ValueError) as e:
+                            return OcrResult(ok=False, raw=j, error=f"百度OCR响应解析失败：{e}")
+                        return OcrResult(ok=True, text=text, words=words_list, raw=j)
+
+                    error_code = j.get("error_code")
+                    last_err = f"百度OCR错误 {error_code}: {j.get('error_msg')}"
+                    last_raw = j
+                    # 图片格式错误、额度用尽等永久性错误，重试无意义，直接返回
+                    if not self._should_retry(resp, error_code):
+                        return OcrResult(ok=False, raw=j, error=last_err)
+                    # token 失效：清 token，下次尝试重新获取
+                    if error_code in _TOKEN_ERROR_CODES:
                         self._token = None
                         self._token_expire_at = 0.0
-                        time.sleep(self._cfg.backoff_sec * (attempt + 1))
-                        continue
-                    return OcrResult(ok=False, raw=j, error=last_err)
-
-                text, words_list = self._parse_words_result(j)
-                return OcrResult(ok=True, text=text, words=words_list, raw=j)
 
-            except Exception as e:
-                last_err = str(e)
-                if attempt < self._cfg.max_retries:
-                    time.sleep(self._cfg.backoff_sec * (attempt + 1))
-                    continue
-                return OcrResult(ok=False, error=f"百度OCR请求失败：{last_err}")
+            if attempt < self._cfg.max_retries:
+                time.sleep(self._retry_delay(attempt, retry_after))
 
-        return OcrResult(ok=False, error=f"百度OCR失败：{last_err or 'unknown'}")
+        return OcrResult(ok=False, raw=last_raw, error=last_err or "百度OCR失败：unknown")
 
     # ---------------- token ----------------
 
     def _get_access_token(self) -> str:
-        now = time.time()
-        if self._token and now < self._token_expire_at:
-            return self._token
-
+        token = self._token
+        if token and time.time() < self._token_expire_at:
+            return token
+
+        # 双重检查：并发识别时只让一个线程去刷新 token
+        with self._token_lock:
+            token = self._token
+            if token and time.time() < self._token_expire_at:
+                return token
+            return self._request_access_token()
+
+    def _request_access_token(self) -> str:
         if self._cfg.debug_mode:
             print(f"[BaiduOcr] 获取 Access Token:")
             print(f"  API Key: {self._cfg.api_key[:10]}... (长度: {len(self._cfg.api_key)})")
@@ -117,7 +173,7 @@ class BaiduOcrEngine(IOcrEngine):
             "client_id": self._cfg.api_key,
             "client_secret": self._cfg.secret_key,
         }
-        resp = requests.get(url, params=params, timeout=self._cfg.timeout_sec)
+        resp = self._session.get(url, params=params, timeout=self._cfg.timeout_sec)
 
         if self._cfg.debug_mode:
             print(f"  响应状态码: {resp.status_code}")
@@ -132,6 +188,7 @@ class BaiduOcrEngine(IOcrEngine):
             raise RuntimeError(f"token返回异常：{json.dumps(j, ensure_ascii=False)[:300]}")
 
         # 提前 60 秒过期，避免边界问题
+        self._endpoint_url = f"https://aip.baidubce.com/rest/2.0/ocr/v1/{self._cfg.api_name}?access_token={token}"
         self._token = token
         self._token_expire_at = time.time() + int(expires_in) - 60
 
@@ -143,9 +200,37 @@ class BaiduOcrEngine(IOcrEngine):
     # ---------------- helpers ----------------
 
     @staticmethod
-    def _read_base64(path: str) -> str:
+    def _should_retry(resp: requests.Response, error_code: Any = None) -> bool:
+        """判断失败是否为临时性错误：HTTP 429/5xx，或百度临时性错误码"""
+        if error_code is not None:
+            return error_code in _TRANSIENT_BAIDU_CODES
+        return resp.status_code == 429 or resp.status_code >= 500
+
+    def _retry_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """指数退避 + 随机抖动；服务端给出 Retry-After 时以其为准"""
+        if retry_after is not None:
+            return min(retry_after, _MAX_RETRY_DELAY_SEC)
+        delay = self._cfg.backoff_sec * (2 ** attempt) * (1 + random.random() * 0.5)
+        return min(delay, _MAX_RETRY_DELAY_SEC)
+
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        """解析 Retry-After 头（秒数或 HTTP-date）"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return None
+
+    @staticmethod
+    def _read_base64(path: str) -> bytes:
         with open(path, "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
+            return binascii.b2a_base64(f.read(), newline=False)
 
     @staticmethod
     def _parse_words_result(j: dict[str, Any]) -> tuple[str, list[OcrWordResult]]:
@@ -154,48 +239,40 @@ class BaiduOcrEngine(IOcrEngine):
         if not isinstance(arr, list):
             return "", []
 
-        parts = []
-        words_list = []
-
-        for idx, it in enumerate(arr):
-            if isinstance(it, dict) and isinstance(it.get("words"), str):
-                text = it["words"]
-                parts.append(text)
-
-                # 尝试解析位置信息 - 百度OCR不同API返回格式不同
-                # 格式1: location字段中
-                location = it.get("location")
-                if location and isinstance(location, dict):
-                    x = int(location.get("left", 0))
-                    y = int(location.get("top", 0))
-                    width = int(location.get("width", 0))
-                    height = int(location.get("height", 0))
-                # 格式2: 直接在顶层 (某些高精度API可能这样返回)
-                elif it.get("left") is not None:
-                    x = int(it.get("left", 0))
-                    y = int(it.get("top", 0))
-                    width = int(it.get("width", 0))
-                    height = int(it.get("height", 0))
-                else:
-                    # 没有位置信息
-                    x = y = width = height = 0
-
-                word_result = OcrWordResult(
+        parts: list[str] = []
+        words_list: list[OcrWordResult] = []
+
+        for it in arr:
+            if not isinstance(it, dict):
+                continue
+            text = it.get("words")
+            if not isinstance(text, str):
+                continue
+            parts.append(text)
+
+            # 位置信息 - 百度OCR不同API返回格式不同：
+            # 格式1: location字段中；格式2: 直接在顶层 (某些高精度API可能这样返回)；否则没有位置信息
+            loc = it.get("location")
+            if not loc or not isinstance(loc, dict):
+                loc = it if it.get("left") is not None else _EMPTY_LOC
+
+            words_list.append(
+                OcrWordResult(
                     text=text,
-                    x=x,
-                    y=y,
-                    width=width,
-                    height=height,
+                    x=int(loc.get("left", 0)),
+                    y=int(loc.get("top", 0)),
+                    width=int(loc.get("width", 0)),
+                    height=int(loc.get("height", 0)),
                     raw=it,
                 )
-
-                # 调试输出第一个结果的位置信息
-                if idx == 0:
-                    print(f"[BaiduOcr] 文本块: {text}")
-                    print(f"  位置信息: x={x}, y={y}, width={width}, height={height}")
-                    if x == 0 and y == 0 and width == 0 and height == 0:
-                        print(f"  ⚠️ 警告: API未返回位置信息！请使用「高精度带坐标」API（accurate）")
-
-                words_list.append(word_result)
+            )
+
+        # 调试输出第一个结果的位置信息
+        if words_list:
+            w = words_list[0]
+            print(f"[BaiduOcr] 文本块: {w.text}")
+            print(f"  位置信息: x={w.x}, y={w.y}, width={w.width}, height={w.height}")
+            if w.x == 0 and w.y == 0 and w.width == 0 and w.height == 0:
+                print(f"  ⚠️ 警告: API未返回位置信息！请使用「高精度带坐标」API（accurate）")
 
         return "\n".join(parts).strip(), words_list
@@ -1,9 +1,10 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any
 
-@dataclass
+@dataclass(slots=True)
 class OcrWordResult:
     """单个识别文字块的结果"""
     text: str
@@ -13,7 +14,7 @@ class OcrWordResult:
     height: int
     raw: dict | None = None
 
-@dataclass
+@dataclass(slots=True)
 class OcrResult:
     ok: bool
     text: str | None = None
@@ -23,5 +24,23 @@ class OcrResult:
 
 class IOcrEngine(ABC):
     @abstractmethod
-    def recognize(self, image_path: str) -> OcrResult:
+    def recognize(self, image_path: str, image_bytes: bytes | None = None) -> OcrResult:
+        """
+        识别图片文字。
+        image_bytes: 调用方已读取的图片内容（可选），提供时不再重复读取 image_path
+        """
         ...
+
+    def recognize_many(self, image_paths: list[str], max_workers: int = 8) -> list[OcrResult]:
+        """
+        并发识别多张图片，结果顺序与 image_paths 一致。
+        OCR 请求以网络等待为主，用线程并发即可让总耗时接近单次最慢请求。
+        """
+        if len(image_paths) <= 1:
+            return [self.recognize(p) for p in image_paths]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(image_paths))) as ex:
+            return list(ex.map(self.recognize, image_paths))
+
+    def close(self) -> None:
+        """释放引擎持有的资源（默认无操作）"""
+        pass
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from services.ocr import _json
+from services.ocr.base_ocr import IOcrEngine, OcrResult, OcrWordResult
+
+# 优先使用 blake3（SIMD 实现，吞吐远高于 md5）；未安装时退回 sha256（OpenSSL 在支持 SHA-NI 的 CPU 上有硬件加速）
+try:
+    from blake3 import blake3 as _image_hasher
+except ImportError:
+    _image_hasher = hashlib.sha256
+
+# 单个磁盘缓存文件的大小上限（超过时不保存原始响应 raw）
+_MAX_DISK_ENTRY_BYTES = 256 * 1024
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """缓存条目"""
+    result: OcrResult
+    timestamp: float  # 写入时间（epoch seconds）
+
+
+class OcrCacheService(IOcrEngine):
+    """
+    OCR结果缓存（装饰器，包装任意 IOcrEngine）：
+    - 按图片内容哈希缓存识别结果，短时间内相同图片不重复请求
+    - 内存缓存 + 磁盘缓存两级
+    - 图片只读取一次，哈希与上传共用同一份字节
+    """
+
+    def __init__(
+        self,
+        engine: IOcrEngine,
+        cache_dir: str,
+        cache_ttl_sec: float = 300.0,
+        max_cache_size: int = 64,
+        max_disk_entries: int = 256,
+        debug_mode: bool = False,
+    ):
+        self._engine = engine
+        self._disk_cache_dir = Path(cache_dir)
+        self._disk_cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache_ttl = cache_ttl_sec
+        self._max_cache_size = max_cache_size
+        self._max_disk_entries = max_disk_entries
+        self._debug_mode = debug_mode
+
+        # 保护内存缓存、磁盘索引和统计数据（recognize_many 会并发调用 recognize）
+        self._lock = threading.RLock()
+
+        # 按最近使用排序（末尾最新），淘汰时从头部弹出
+        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        # 磁盘缓存索引 {hash: 写入时间}，按写入时间从旧到新排列；启动时扫描一次目录，之后随读写维护，避免反复遍历目录
+        self._disk_index: dict[str, float] = {}
+        self._last_disk_sweep = time.time()
+        self._load_disk_index()
+
+    def recognize(self, image_path: str, image_bytes: bytes | None = None) -> OcrResult:
+        if image_bytes is None:
+            try:
+                with open(image_path, "rb") as f:
+                    image_bytes = f.read()
+            except Exception as e:
+                return OcrResult(ok=False, error=f"读取图片失败：{e}")
+
+        image_hash = self._calculate_image_hash(image_bytes)
+
+        # 查缓存与统计在锁内完成；真正的 OCR 请求在锁外执行，recognize_many 时多个线程可并行请求
+        with self._lock:
+            result = self._check_memory_cache(image_hash)
+            if result is not None:
+                self._stats["memory_hits"] += 1
+                self._debug_print(f"[OcrCache] 内存缓存命中: {image_hash}")
+                return result
+
+            result = self._check_disk_cache(image_hash)
+            if result is not None:
+                self._stats["disk_hits"] += 1
+                self._debug_print(f"[OcrCache] 磁盘缓存命中: {image_hash}")
+                self._add_to_memory_cache(image_hash, result)
+                return result
+
+            self._stats["misses"] += 1
+
+        result = self._engine.recognize(image_path, image_bytes=image_bytes)
+
+        # 只缓存成功的结果，失败的下次重新请求
+        if result.ok:
+            with self._lock:
+                self._add_to_memory_cache(image_hash, result)
+                self._save_to_disk_cache(image_hash, result)
+
+        return result
+
+    def close(self) -> None:
+        self._engine.close()
+
+    def clear_cache(self) -> None:
+        """清空内存缓存和磁盘缓存"""
+        with self._lock:
+            self._cache.clear()
+            for image_hash in self._disk_index:
+                self._remove_disk_file(image_hash)
+            self._disk_index.clear()
+
+    def cleanup_expired_cache(self) -> int:
+        """清理过期的磁盘缓存，返回删除的文件数"""
+        current_time = time.time()
+        with self._lock:
+            expired = [h for h, ts in self._disk_index.items() if current_time - ts > self._cache_ttl]
+            for image_hash in expired:
+                del self._disk_index[image_hash]
+                self._remove_disk_file(image_hash)
+        return len(expired)
+
+    def get_stats(self) -> dict[str, int]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                **self._stats,
+                "memory_size": len(self._cache),
+                "disk_size": len(self._disk_index),
+            }
+
+    # ---------------- memory ----------------
+
+    def _check_memory_cache(self, image_hash: str) -> OcrResult | None:
+        entry = self._cache.get(image_hash)
+        if entry is None:
+            return None
+        if time.time() - entry.timestamp > self._cache_ttl:
+            del self._cache[image_hash]
+            return None
+        self._cache.move_to_end(image_hash)
+        return entry.result
+
+    def _add_to_memory_cache(self, image_hash: str, result: OcrResult) -> None:
+        self._cache[image_hash] = CacheEntry(result=result, timestamp=time.time())
+        self._cache.move_to_end(image_hash)
+        while len(self._cache) > self._max_cache_size:
+            self._cache.popitem(last=False)
+
+    # ---------------- disk ----------------
+
+    def _load_disk_index(self) -> None:
+        """扫描磁盘缓存目录建立索引，顺带删除已过期的文件、写到一半留下的临时文件，并执行条目上限"""
+        for p in self._disk_cache_dir.glob("*.json.tmp"):
+            try:
+                p.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+        entries: list[tuple[float, str, Path]] = []
+        for p in self._disk_cache_dir.glob("*.json"):
+            try:
+                entries.append((p.stat().st_mtime, p.stem, p))
+            except OSError:
+                pass
+
+        now = time.time()
+        for timestamp, image_hash, p in sorted(entries):
+            if now - timestamp > self._cache_ttl:
+                try:
+                    p.unlink(missing_ok=True)
+                except Exception:
+                    pass
+                continue
+            self._disk_index[image_hash] = timestamp
+
+        self._prune_disk_cache(now)
+
+    def _prune_disk_cache(self, now: float) -> None:
+        """
+        限制磁盘缓存规模：
+        - 每隔一个 TTL 周期清理一次过期文件（截图几乎不会重复，过期文件等不到再次命中时被删除）
+        - 条目数超过上限时从最早写入的开始删除
+        """
+        if now - self._last_disk_sweep >= self._cache_ttl:
+            self._last_disk_sweep = now
+            self.cleanup_expired_cache()
+
+        while len(self._disk_index) > self._max_disk_entries:
+            image_hash = next(iter(self._disk_index))
+            del self._disk_index[image_hash]
+            self._remove_disk_file(image_hash)
+
+    def _remove_disk_file(self, image_hash: str) -> None:
+        try:
+            self._cache_path(image_hash).unlink(missing_ok=True)
+        except Exception:
+            pass
+
+    def _check_disk_cache(self, image_hash: str) -> OcrResult | None:
+        timestamp = self._disk_index.get(image_hash)
+        if timestamp is None:
+            return None
+
+        cache_file = self._cache_path(image_hash)
+
+        # 先按索引中的写入时间判断过期，过期文件直接删除，不再打开解析
+        if time.time() - timestamp > self._cache_ttl:
+            del self._disk_index[image_hash]
+            self._remove_disk_file(image_hash)
+            return None
+
+        try:
+            with open(cache_file, "rb") as f:
+                cache_data = _json.loads(f.read())
+        except Exception as e:
+            # 文件损坏时直接删除，避免每次都在同一个文件上失败
+            self._disk_index.pop(image_hash, None)
+            self._remove_disk_file(image_hash)
+            self._debug_print(f"[OcrCache] 读取磁盘缓存失败: {e}")
+            return None
+
+        words = [OcrWordResult(**w) for w in cache_data.get("words") or []]
+        return OcrResult(ok=True, text=cache_data.get("text"), words=words, raw=cache_data.get("raw"))
+
+    def _save_to_disk_cache(self, image_hash: str, result: OcrResult) -> None:
+        # 内容寻址：同一哈希已有未过期的文件，无需重复写入
+        now = time.time()
+        timestamp = self._disk_index.get(image_hash)
+        if timestamp is not None and now - timestamp <= self._cache_ttl:
+            return
+
+        cache_file = self._cache_path(image_hash)
+        cache_data = {
+            "timestamp": now,
+            "text": result.text,
+            "words": [
+                {"text": w.text, "x": w.x, "y": w.y, "width": w.width, "height": w.height, "raw": w.raw}
+                for w in result.words or []
+            ],
+            "raw": result.raw,
+        }
+        # 先写临时文件再原子替换，进程中途被杀也不会留下半截的缓存文件
+        tmp_file = cache_file.with_suffix(".json.tmp")
+        try:
+            payload = _json.dumps(cache_data)
+            # 原始响应过大时不落盘（文本和文字块已足够还原识别结果）
+            if len(payload) > _MAX_DISK_ENTRY_BYTES and cache_data["raw"] is not None:
+                cache_data["raw"] = None
+                payload = _json.dumps(cache_data)
+            tmp_file.write_bytes(payload)
+            os.replace(tmp_file, cache_file)
+            # 先删再插，保持索引按写入时间排序（最早写入的在最前，超出上限时先被删除）
+            self._disk_index.pop(image_hash, None)
+            self._disk_index[image_hash] = now
+        except Exception as e:
+            self._debug_print(f"[OcrCache] 写入磁盘缓存失败: {e}")
+            return
+
+        self._prune_disk_cache(now)
+
+    # ---------------- helpers ----------------
+
+    def _cache_path(self, image_hash: str) -> Path:
+        return self._disk_cache_dir / f"{image_hash}.json"
+
+    @staticmethod
+    def _calculate_image_hash(image_bytes: bytes) -> str:
+        # 取摘要前 15 字节做小写 base32：24 个字符、120 位，比 64 位十六进制短得多；
+        # 不用 base64 是因为 Windows 文件名不区分大小写
+        return base64.b32encode(_image_hasher(image_bytes).digest()[:15]).decode("ascii").lower()
+
+    def _debug_print(self, *args, **kwargs):
+        """调试输出，仅在调试模式下打印"""
+        if self._debug_mode:
+            print(*args, **kwargs)
@@ -1,11 +1,28 @@
 import ctypes
 
+from core.constants import DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2
+
+# 模块私有的 user32 实例：argtypes/restype 只作用于本模块，不影响全局的 ctypes.windll.user32
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+
+# 模块加载时解析一次函数地址并声明参数类型（DPI_AWARENESS_CONTEXT 是指针大小的句柄）；
+# 旧系统（Win10 1703 之前没有此函数）时为 None
+try:
+    _set_dpi_awareness_context = _user32.SetProcessDpiAwarenessContext
+    _set_dpi_awareness_context.argtypes = [ctypes.c_void_p]
+    _set_dpi_awareness_context.restype = ctypes.c_int
+except AttributeError:
+    _set_dpi_awareness_context = None
+
+
 def enable_per_monitor_v2_dpi_awareness():
     """
     开启 Per-Monitor v2 DPI awareness，避免高DPI下窗口/截图/overlay坐标不一致。
     """
+    if _set_dpi_awareness_context is None:
+        return
     try:
-        ctypes.windll.user32.SetProcessDpiAwarenessContext(ctypes.c_void_p(-4))  # DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2
+        _set_dpi_awareness_context(ctypes.c_void_p(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2))
     except Exception:
-        # 兼容旧系统/权限不足等情况
+        # 兼容权限不足等情况
         pass
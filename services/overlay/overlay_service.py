@@ -1,11 +1,23 @@
 import tkinter as tk
+import tkinter.font as tkfont
 from dataclasses import dataclass
-from typing import Any
+
+import win32gui
 
 from services.overlay.target_window import get_client_rect_in_screen
+from services.overlay.win_event_hook import LocationChangeHook
+
+# 没有事件钩子时轮询目标窗口位置的间隔
+_POLL_INTERVAL_MS = 100
+# 有事件钩子时只需低频检查目标窗口是否已关闭
+_HEARTBEAT_INTERVAL_MS = 1000
+# 文本项（背景、文字、边框）共用的画布标签，清除时只删这一层
+_TEXT_TAG = "ocr_text"
+# 文本宽度缓存的条目上限，超过时整体清空
+_TEXT_WIDTH_CACHE_SIZE = 4096
 
 
-@dataclass
+@dataclass(slots=True)
 class OverlayTextItem:
     """覆盖层上的文本项"""
     text: str
@@ -25,8 +37,18 @@ class OverlayService:
         self._window: tk.Toplevel | None = None
         self._canvas: tk.Canvas | None = None
         self._target_hwnd: int | None = None
-        self._text_items: list[Any] = []
+        self._text_items: list[OverlayTextItem] = []
+        # 已绘制的文本项：位置键 -> (文本项, 画布元素id)
+        self._item_map: dict[tuple[int, ...], tuple[OverlayTextItem, tuple[int, int, int]]] = {}
+        self._content_key: tuple | None = None  # 上次显示内容的字段快照
+        self._font_cache: dict[int, tkfont.Font] = {}  # 字号 -> 字体对象
+        self._text_width_cache: dict[tuple[int, str], int] = {}  # (字号, 文本) -> 像素宽度
         self._visible = False
+        self._location_hook: LocationChangeHook | None = None
+        self._hooked = False
+        self._sync_pending = False
+        self._withdrawn = False  # 目标窗口最小化时覆盖层被隐藏
+        self._last_rect: tuple[int, int, int, int] = (0, 0, 0, 0)  # 上次同步的 client 区域 (x, y, w, h)
 
     def create_overlay(self, target_hwnd: int):
         """创建覆盖层窗口"""
@@ -36,7 +58,7 @@ class OverlayService:
         self._target_hwnd = target_hwnd
 
         # 获取目标窗口的client区域位置
-        x, y, width, height = get_client_rect_in_screen(target_hwnd)
+        x, y, width, height = self._last_rect = get_client_rect_in_screen(target_hwnd)
 
         # 创建覆盖层窗口
         self._window = tk.Toplevel()
@@ -68,28 +90,73 @@ class OverlayService:
             )
         self._canvas.pack(fill=tk.BOTH, expand=True)
 
-        # 绑定窗口位置同步（当目标窗口移动时，覆盖层也跟着移动）
-        self._window.after(100, self._sync_window_position)
+        # 绑定窗口位置同步（当目标窗口移动时，覆盖层也跟着移动）：
+        # 优先用系统事件钩子驱动，装不上时退回定时轮询
+        self._location_hook = LocationChangeHook(target_hwnd, self._on_target_location_changed)
+        self._hooked = self._location_hook.install()
+        self._window.after(_POLL_INTERVAL_MS, self._watch_target)
 
         return True
 
-    def _sync_window_position(self):
-        """同步覆盖层窗口与目标窗口的位置"""
+    def _watch_target(self):
+        """定时检查目标窗口是否还在；没有事件钩子时顺带同步位置"""
         if self._window is None or self._target_hwnd is None:
             return
 
         try:
-            import win32gui
             if not win32gui.IsWindow(self._target_hwnd):
                 self.close()
                 return
+        except Exception:
+            pass
+
+        if not self._hooked:
+            self._sync_window_position()
+
+        # 继续检查
+        if self._visible:
+            interval = _HEARTBEAT_INTERVAL_MS if self._hooked else _POLL_INTERVAL_MS
+            self._window.after(interval, self._watch_target)
+
+    def _on_target_location_changed(self):
+        """事件钩子回调：拖动窗口时通知很密集，合并到下一次空闲时只同步一次"""
+        if self._window is None or self._sync_pending:
+            return
+        self._sync_pending = True
+        self._window.after_idle(self._sync_window_position)
+
+    def _sync_window_position(self):
+        """同步覆盖层窗口与目标窗口的位置"""
+        self._sync_pending = False
+        if self._window is None or self._target_hwnd is None:
+            return
+
+        try:
+            # 目标窗口最小化时隐藏覆盖层，隐藏期间不更新位置、不重绘
+            if win32gui.IsIconic(self._target_hwnd):
+                if not self._withdrawn:
+                    self._window.withdraw()
+                    self._withdrawn = True
+                return
+            if self._withdrawn:
+                self._window.deiconify()
+                self._withdrawn = False
 
             # 获取新的client区域位置
-            x, y, width, height = get_client_rect_in_screen(self._target_hwnd)
+            rect = get_client_rect_in_screen(self._target_hwnd)
+            if rect == self._last_rect:
+                return
+            x, y, width, height = rect
+            resized = rect[2:] != self._last_rect[2:]
+            self._last_rect = rect
+
+            if not resized:
+                # 只是平移：只移动窗口，画布内容是相对 client 的坐标，保持不变
+                self._window.geometry(f"+{x}+{y}")
+                return
 
-            # 更新覆盖层窗口位置和大小
+            # 更新覆盖层窗口位置和大小（画布以 fill/expand 填满窗口，会随窗口一起调整，无需再单独设置尺寸）
             self._window.geometry(f"{width}x{height}+{x}+{y}")
-            self._canvas.config(width=width, height=height)
 
             # 重新绘制文本
             if self._text_items:
@@ -98,88 +165,168 @@ class OverlayService:
         except Exception:
             pass
 
-        # 继续同步
-        if self._visible:
-            self._window.after(100, self._sync_window_position)
-
     def show_texts(self, text_items: list[OverlayTextItem]):
-        """在覆盖层上显示文本"""
+        """
+        在覆盖层上显示文本。
+        覆盖层直接持有传入的列表（不复制），调用方传入后不应再修改它。
+        """
         if self._canvas is None:
             return
 
-        # 清除现有文本
-        self._canvas.delete("all")
-        self._text_items = text_items.copy()
+        # 内容与上次完全相同（OCR结果稳定时很常见）就不碰 Tk
+        content_key = tuple(
+            (it.text, it.x, it.y, it.width, it.height, it.color, it.font_size, it.background)
+            for it in text_items
+        )
+        if content_key == self._content_key and self._visible:
+            return
 
-        # 绘制每个文本项
-        for item in text_items:
-            self._draw_text_item(item)
+        self._text_items = text_items
+        self._content_key = content_key
+        self._sync_canvas_items()
 
         self._visible = True
 
-    def _draw_text_item(self, item: OverlayTextItem):
-        """绘制单个文本项"""
+    def _sync_canvas_items(self):
+        """
+        增量更新画布：按识别框位置与上次绘制的结果比对，
+        只为新增项创建画布元素、删除消失项、原地修改内容有变化的项，未变化的项不产生任何 Tk 调用。
+        """
         if self._canvas is None:
             return
 
-        # 计算文本框大小
-        text_width = len(item.text) * item.font_size * 0.6  # 估算宽度
+        new_map: dict[tuple[int, ...], tuple[OverlayTextItem, tuple[int, int, int]]] = {}
+        seen: dict[tuple[int, int, int, int], int] = {}
+        for item in self._text_items:
+            # 同一位置可能出现多个文本项，用出现序号区分
+            box = (item.x, item.y, item.width, item.height)
+            n = seen.get(box, 0)
+            seen[box] = n + 1
+            key = (*box, n)
+
+            entry = self._item_map.pop(key, None)
+            if entry is None:
+                ids = self._draw_text_item(item)
+            else:
+                old_item, ids = entry
+                if old_item != item:
+                    self._update_text_item(ids, item)
+            new_map[key] = (item, ids)
+
+        # 剩下的是本次不再显示的项
+        for _, ids in self._item_map.values():
+            self._canvas.delete(*ids)
+        self._item_map = new_map
+
+    def _background_box(self, item: OverlayTextItem) -> tuple[int, int, int, int]:
+        """计算文本背景框坐标"""
+        text_width = self._measure_text(item.font_size, item.text) + 10  # 文字左右各留 5px
         text_height = item.font_size + 4
-
-        # 绘制背景（半透明效果需要用stipple模拟）
-        self._canvas.create_rectangle(
+        return (
             item.x,
             item.y,
             item.x + max(item.width, int(text_width)),
             item.y + max(item.height, text_height),
+        )
+
+    def _draw_text_item(self, item: OverlayTextItem) -> tuple[int, int, int]:
+        """绘制单个文本项，返回 (背景, 文本, 边框) 的画布元素 id"""
+        # 绘制背景（半透明效果需要用stipple模拟）
+        bg_id = self._canvas.create_rectangle(
+            *self._background_box(item),
             fill=item.background,
             outline=item.color,
             stipple="gray50",  # 半透明效果
+            tags=(_TEXT_TAG,),
         )
 
         # 绘制文本
-        self._canvas.create_text(
+        text_id = self._canvas.create_text(
             item.x + 5,
             item.y + 5,
             text=item.text,
             fill=item.color,
-            font=("Arial", item.font_size, "bold"),
+            font=self._get_font(item.font_size),
             anchor="nw",
+            tags=(_TEXT_TAG,),
         )
 
         # 绘制边框
-        self._canvas.create_rectangle(
+        border_id = self._canvas.create_rectangle(
             item.x,
             item.y,
             item.x + item.width,
             item.y + item.height,
             outline="#FFFF00",  # 黄色边框标记原始识别区域
             width=2,
+            tags=(_TEXT_TAG,),
         )
 
-    def _redraw_texts(self):
-        """重新绘制所有文本"""
-        if self._canvas is None:
-            return
+        return bg_id, text_id, border_id
 
-        self._canvas.delete("all")
-        for item in self._text_items:
-            self._draw_text_item(item)
+    def _update_text_item(self, ids: tuple[int, int, int], item: OverlayTextItem):
+        """原地修改已绘制的文本项（位置不变，内容或样式变化）"""
+        bg_id, text_id, _ = ids
+        self._canvas.coords(bg_id, *self._background_box(item))
+        self._canvas.itemconfigure(bg_id, fill=item.background, outline=item.color)
+        self._canvas.itemconfigure(
+            text_id,
+            text=item.text,
+            fill=item.color,
+            font=self._get_font(item.font_size),
+        )
+
+    def _get_font(self, size: int) -> tkfont.Font:
+        """按字号缓存字体对象，避免 Tk 每次解析字体描述、重新分配字体资源"""
+        font = self._font_cache.get(size)
+        if font is None:
+            font = tkfont.Font(root=self._window, family="Arial", size=size, weight="bold")
+            self._font_cache[size] = font
+        return font
+
+    def _measure_text(self, size: int, text: str) -> int:
+        """
+        文本实际像素宽度（按字号、文本缓存）。
+        按字符数估算对中文偏窄，这里用字体实测；同样的文本每次识别都会出现，缓存后只测一次。
+        """
+        key = (size, text)
+        width = self._text_width_cache.get(key)
+        if width is None:
+            if len(self._text_width_cache) >= _TEXT_WIDTH_CACHE_SIZE:
+                self._text_width_cache.clear()
+            width = self._get_font(size).measure(text)
+            self._text_width_cache[key] = width
+        return width
+
+    def _redraw_texts(self):
+        """重新绘制所有文本（只处理有变化的项）"""
+        self._sync_canvas_items()
 
     def clear(self):
         """清除覆盖层上的所有内容"""
         if self._canvas is not None:
-            self._canvas.delete("all")
+            self._canvas.delete(_TEXT_TAG)
         self._text_items = []
+        self._item_map = {}
+        self._content_key = None
 
     def close(self):
         """关闭覆盖层"""
         self._visible = False
+        if self._location_hook is not None:
+            self._location_hook.uninstall()
+            self._location_hook = None
+            self._hooked = False
         if self._window is not None:
             self._window.destroy()
             self._window = None
             self._canvas = None
+        self._withdrawn = False
+        self._font_cache = {}
+        self._text_width_cache = {}
         self._text_items = []
+        self._item_map = {}
+        self._content_key = None
 
     def is_visible(self) -> bool:
         """检查覆盖层是否可见"""
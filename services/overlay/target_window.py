@@ -1,11 +1,21 @@
-import win32gui
+import ctypes
+from ctypes import wintypes
+
+# 模块私有的 user32 实例：argtypes/restype 只作用于本模块，不影响全局的 ctypes.windll.user32
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_user32.GetClientRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+_user32.GetClientRect.restype = wintypes.BOOL
+_user32.MapWindowPoints.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.POINTER(wintypes.RECT), wintypes.UINT]
+_user32.MapWindowPoints.restype = ctypes.c_int
+
 
 def get_client_rect_in_screen(hwnd: int):
     """
     返回 (x, y, w, h) —— 目标窗口 client 区域在屏幕坐标系下的位置和大小
     """
-    left, top, right, bottom = win32gui.GetClientRect(hwnd)  # client rect in client coords
-    x, y = win32gui.ClientToScreen(hwnd, (0, 0))             # client (0,0) -> screen
-    w = right - left
-    h = bottom - top
-    return x, y, w, h
+    rect = wintypes.RECT()
+    if not _user32.GetClientRect(hwnd, ctypes.byref(rect)):  # client rect in client coords
+        raise ctypes.WinError(ctypes.get_last_error())
+    # 一次调用把 RECT 的两个角都映射到屏幕坐标（hWndTo=NULL 即屏幕），镜像(RTL)窗口也能得到正确结果
+    _user32.MapWindowPoints(hwnd, None, ctypes.byref(rect), 2)
+    return rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top
@@ -0,0 +1,84 @@
+import ctypes
+from ctypes import wintypes
+from typing import Callable
+
+import win32process
+
+EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+OBJID_WINDOW = 0
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+
+_WinEventProc = ctypes.WINFUNCTYPE(
+    None,
+    wintypes.HANDLE,  # hWinEventHook
+    wintypes.DWORD,   # event
+    wintypes.HWND,    # hwnd
+    wintypes.LONG,    # idObject
+    wintypes.LONG,    # idChild
+    wintypes.DWORD,   # idEventThread
+    wintypes.DWORD,   # dwmsEventTime
+)
+
+# 模块私有的 user32 实例：argtypes/restype 只作用于本模块，不影响全局的 ctypes.windll.user32
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_user32.SetWinEventHook.argtypes = [
+    wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, _WinEventProc,
+    wintypes.DWORD, wintypes.DWORD, wintypes.DWORD,
+]
+_user32.SetWinEventHook.restype = wintypes.HANDLE
+_user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+_user32.UnhookWinEvent.restype = wintypes.BOOL
+
+
+class LocationChangeHook:
+    """
+    监听目标窗口的移动/缩放（EVENT_OBJECT_LOCATIONCHANGE），由系统通知代替定时轮询。
+    - 使用 WINEVENT_OUTOFCONTEXT，回调在安装钩子的线程（Tk 主线程）的消息循环中执行
+    - 只订阅目标进程的事件，回调里再按 hwnd 过滤
+    """
+
+    def __init__(self, hwnd: int, on_change: Callable[[], None]):
+        self._hwnd = hwnd
+        self._on_change = on_change
+        self._hook = None
+        self._proc = None  # 必须持有回调对象，否则会被回收导致崩溃
+
+    def install(self) -> bool:
+        """安装钩子，失败时返回 False（调用方退回定时轮询）"""
+        if self._hook:
+            return True
+        try:
+            _, pid = win32process.GetWindowThreadProcessId(self._hwnd)
+            self._proc = _WinEventProc(self._callback)
+            self._hook = _user32.SetWinEventHook(
+                EVENT_OBJECT_LOCATIONCHANGE,
+                EVENT_OBJECT_LOCATIONCHANGE,
+                None,
+                self._proc,
+                pid,
+                0,
+                WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS,
+            )
+        except Exception:
+            self._hook = None
+        if not self._hook:
+            self._proc = None
+            return False
+        return True
+
+    def uninstall(self) -> None:
+        if self._hook:
+            try:
+                _user32.UnhookWinEvent(self._hook)
+            except Exception:
+                pass
+        self._hook = None
+        self._proc = None
+
+    def _callback(self, hook, event, hwnd, id_object, id_child, thread_id, event_time):
+        if hwnd == self._hwnd and id_object == OBJID_WINDOW:
+            try:
+                self._on_change()
+            except Exception:
+                pass
@@ -6,10 +6,16 @@ class ProcessWatcher:
 
     def __init__(self, interval_ms: int = 500):
         self.interval_ms = interval_ms
+        # 缓存被监视进程的 Process 对象，避免每次检测都重新构造；
+        # is_running() 会比对进程创建时间，PID 被复用时也能正确判定为已退出
+        self._proc: psutil.Process | None = None
 
     def is_alive(self, bound: BoundGame) -> bool:
         try:
-            p = psutil.Process(bound.pid)
+            p = self._proc
+            if p is None or p.pid != bound.pid:
+                p = self._proc = psutil.Process(bound.pid)
             return p.is_running()
         except Exception:
+            self._proc = None
             return False
@@ -1,30 +1,58 @@
+import ctypes
+from ctypes import wintypes
+
 import win32gui
 import win32process
 
+# 模块私有的 user32 实例：argtypes/restype 只作用于本模块，不影响全局的 ctypes.windll.user32
+_user32 = ctypes.WinDLL("user32", use_last_error=True)
+_user32.FindWindowW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR]
+_user32.FindWindowW.restype = wintypes.HWND
+
+
 class WindowFinder:
     """枚举窗口并按标题关键字匹配。"""
 
     def __init__(self, keywords: tuple[str, ...]):
         self._keywords = keywords
+        # 小写关键字只算一次，匹配时不再对每个 窗口×关键字 重复 lower()
+        self._keywords_lower = tuple(k.lower() for k in keywords)
 
     def find_first_match(self) -> tuple[int | None, str | None]:
-        windows: list[tuple[int, str]] = []
+        # 快速路径：标题与关键字完全一致时 FindWindow 一次系统调用即可找到，无需枚举所有顶层窗口
+        # 未找到时 FindWindowW 返回 NULL（pywin32 的 FindWindow 会抛异常）
+        for k in self._keywords:
+            hwnd = _user32.FindWindowW(None, k)
+            if hwnd and win32gui.IsWindowVisible(hwnd):
+                # FindWindow 比较标题不区分大小写，返回窗口实际标题
+                return hwnd, win32gui.GetWindowText(hwnd) or k
+
+        keywords_lower = self._keywords_lower
+        match: tuple[int, str] | None = None
 
         def callback(hwnd, _):
+            nonlocal match
             if not win32gui.IsWindowVisible(hwnd):
                 return
             title = win32gui.GetWindowText(hwnd) or ""
-            if title.strip():
-                windows.append((hwnd, title))
-
-        win32gui.EnumWindows(callback, None)
-
-        for hwnd, title in windows:
+            if not title.strip():
+                return
+            # 在枚举回调里直接匹配，找到第一个就返回 False 停止枚举，不再收集剩余窗口
             low = title.lower()
-            for k in self._keywords:
-                if k.lower() in low:
-                    return hwnd, title
+            for k in keywords_lower:
+                if k in low:
+                    match = (hwnd, title)
+                    return False
+
+        try:
+            win32gui.EnumWindows(callback, None)
+        except Exception:
+            # 回调返回 False 中止枚举时，部分 pywin32 版本会把 EnumWindows 的 FALSE 返回值当作错误抛出
+            if match is None:
+                raise
 
+        if match is not None:
+            return match
         return None, None
 
     @staticmethod